@@ -19,3 +19,6 @@ with this program. If not, see https://www.gnu.org/licenses/
 
 # Bytes of data to read
 BLOCKSIZE = 1024
+
+# Bytes of data to read per update when hashing
+HASH_BLOCKSIZE = 1024 * 1024
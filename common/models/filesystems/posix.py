@@ -22,7 +22,7 @@ import hashlib
 import os
 
 from ... import types as T
-from ...constants import BLOCKSIZE
+from ...constants import BLOCKSIZE, HASH_BLOCKSIZE
 from ...exceptions import NOT_IMPLEMENTED
 from .types import Data, DataGenerator, BaseFilesystem, UnsupportedByFilesystem
 
@@ -91,13 +91,20 @@ class POSIXFilesystem(BaseFilesystem):
     def _checksum(self, algorithm:str, address:T.Path) -> str:
         h = hashlib.new(algorithm)
 
-        with open(address, "rb") as f:
+        # NOTE We read unbuffered into a reusable buffer, to avoid both
+        # a second copy through Python's I/O buffer and allocating a
+        # new block for each read (cf. hashlib.file_digest in Py3.11)
+        buffer = bytearray(HASH_BLOCKSIZE)
+        view = memoryview(buffer)
+
+        with open(address, "rb", buffering=0) as f:
             while True:
-                block = f.read(BLOCKSIZE)
-                if not block:
+                # TODO Py3.8 walrus operator would be good here
+                read = f.readinto(buffer)
+                if not read:
                     break
 
-                h.update(block)
+                h.update(view[:read])
 
         return h.hexdigest()
 
@@ -41,6 +41,10 @@ class DataInaccessible(Exception):
 @dataclass
 class Data:
     """ Simple file object model """
+    # NOTE dataclass(slots=True) needs Python 3.10, so we declare the
+    # slots manually; this is safe as neither field has a default
+    __slots__ = ("filesystem", "address")
+
     filesystem:BaseFilesystem
     address:T.Path
 
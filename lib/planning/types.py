@@ -22,8 +22,6 @@ with this program. If not, see https://www.gnu.org/licenses/
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from copy import copy
-from functools import singledispatch
 
 from common import types as T
 from common.templating import BaseTemplating
@@ -79,25 +77,26 @@ class BaseRouteTransformation(CostBearing, metaclass=ABCMeta):
 
 IOTransformer = T.Callable[[IOGenerator], IOGenerator]
 
-class RouteIOTransformation(T.Carrier[IOTransformer], BaseRouteTransformation):
-    """ Transform the I/O stream """
-    def __init__(self, transformer:IOTransformer, cost:PolynomialComplexity = On) -> None:
-        self.payload = transformer
+class RouteIOTransformation(T.Carrier[T.Tuple[IOTransformer, ...]], BaseRouteTransformation):
+    """ Transform the I/O stream through a pipeline of transformers """
+    def __init__(self, *transformers:IOTransformer, cost:PolynomialComplexity = On) -> None:
+        self.payload = transformers
         self.cost = cost
 
     def __call__(self, io:IOGenerator) -> IOGenerator:
-        transformer = self.payload
-        return transformer(io)
+        for transformer in self.payload:
+            io = transformer(io)
+
+        return io
 
     def __add__(self, rhs:RouteIOTransformation) -> RouteIOTransformation:
         # Composition is this way around so the summation over the list
         # of transformers (i.e., in the TransferRoute edge) is done in
         # the same order as transformers are added
-        composition = lambda io: rhs.payload(self.payload(io))
-        return RouteIOTransformation(composition, self.cost + rhs.cost)
+        return RouteIOTransformation(*self.payload, *rhs.payload, cost=self.cost + rhs.cost)
 
 
-class RouteScriptTransformation(T.Carrier[BaseTemplating], BaseRouteTransformation):
+class RouteScriptTransformation(T.Carrier[T.Tuple[BaseTemplating, ...]], BaseRouteTransformation):
     """
     Transform the transfer script
 
@@ -118,59 +117,42 @@ class RouteScriptTransformation(T.Carrier[BaseTemplating], BaseRouteTransformati
         [[ script ]]
         echo "Completed transfer to {{ target }}"
 
+    Composed transformations render each wrapper, in order, around the
+    output of the last.
     """
-    def __init__(self, templating:BaseTemplating, cost:PolynomialComplexity = O1) -> None:
+    def __init__(self, *templatings:BaseTemplating, cost:PolynomialComplexity = O1) -> None:
         # TODO Subclass this, rather than relying on runtime checks
-        assert "wrapper" in templating.templates
-        self.payload = templating
+        assert all("wrapper" in templating.templates for templating in templatings)
+        self.payload = templatings
         self.cost = cost
 
     def __call__(self, script:str) -> str:
-        templating = self.payload
-        return templating.render("wrapper", script=script)
+        for templating in self.payload:
+            script = templating.render("wrapper", script=script)
+
+        return script
 
     def __add__(self, rhs:RouteScriptTransformation) -> RouteScriptTransformation:
         # Composition is this way around so the summation over the list
         # of transformers (i.e., in the TransferRoute edge) is done in
         # the same order as transformers are added
-        script = self.payload.get_template("wrapper")
-        wrapped = rhs(script)
-
-        templating = copy(rhs.payload)
-        templating.add_template("wrapper", wrapped)
-
-        return RouteScriptTransformation(templating, self.cost + rhs.cost)
-
-
-_noop_io_transformer = RouteIOTransformation(lambda io: io)
-
-class _NoopScriptTransformer(RouteScriptTransformation):
-    """
-    This is an templating engine-agnostic RouteScriptTransformation that
-    simply returns whatever is passed through it
-    """
-    def __init__(self) -> None:
-        pass
-
-    def __call__(self, script:str) -> str:
-        return script
+        return RouteScriptTransformation(*self.payload, *rhs.payload, cost=self.cost + rhs.cost)
 
-    def __add__(self, rhs:RouteScriptTransformation) -> RouteScriptTransformation:
-        return rhs
 
-    def __radd__(self, lhs:RouteScriptTransformation) -> RouteScriptTransformation:
-        return lhs
+_noop_io_transformer = RouteIOTransformation()
+_noop_script_transformer = RouteScriptTransformation()
 
 # These zeros are needed for the algebra over the transformers
 _zeros = {
     RouteIOTransformation:     _noop_io_transformer,
-    RouteScriptTransformation: _NoopScriptTransformer()
+    RouteScriptTransformation: _noop_script_transformer
 }
 
 
 class TransferRoute(Edge, T.Carrier[T.List[BaseRouteTransformation]]):
     """ Data transfer route """
     _templating:BaseTemplating
+    _composed:T.Dict[T.Type[BaseRouteTransformation], BaseRouteTransformation]
 
     def __init__(self, source:FilesystemVertex, target:FilesystemVertex, *, templating:BaseTemplating, cost:PolynomialComplexity = On) -> None:
         """
@@ -192,17 +174,11 @@ class TransferRoute(Edge, T.Carrier[T.List[BaseRouteTransformation]]):
         self._templating = templating
 
         self.payload = []
+        self._composed = {}
         self.cost = cost
 
         super().__init__(source, target, directed=True)
 
-        # TODO From Python 3.8 there will be a singledispatchmethod
-        # decorator; move to this when it's available, rather than using
-        # the following workaround
-        self.plan = singledispatch(self._plan_by_data_generator)
-        self.plan.register(DataGenerator, self._plan_by_data_generator)
-        self.plan.register(str, self._plan_by_query)
-
     @property
     def source(self) -> BaseFilesystem:
         # Convenience alias
@@ -216,13 +192,31 @@ class TransferRoute(Edge, T.Carrier[T.List[BaseRouteTransformation]]):
     def __iadd__(self, transform:BaseRouteTransformation) -> TransferRoute:
         """ Add a transformation to the route """
         self._payload.append(transform)
+        self._composed = {}
         self.cost += transform.cost
         return self
 
     def get_transform(self, transform_type:T.Type[BaseRouteTransformation]) -> BaseRouteTransformation:
         """ Filter the transforms by type and compose """
-        transformers = (t for t in self.payload if isinstance(t, transform_type))
-        return sum(transformers, _zeros[transform_type])
+        # Compositions are memoised until the route's transforms change
+        if transform_type not in self._composed:
+            transformers = (t for t in self.payload if isinstance(t, transform_type))
+            self._composed[transform_type] = sum(transformers, _zeros[transform_type])
+
+        return self._composed[transform_type]
+
+    def plan(self, data:T.Union[str, DataGenerator]) -> TaskGenerator:
+        """
+        Plan the transfer of data, either identified by query or from a
+        data generator, along the route
+
+        @param   data  Search criteria or input data generator
+        @return  Iterator of transfer plan steps
+        """
+        if isinstance(data, str):
+            return self._plan_by_query(data)
+
+        return self._plan_by_data_generator(data)
 
     def _plan_by_query(self, query:str) -> TaskGenerator:
         """
@@ -19,12 +19,12 @@ with this program. If not, see https://www.gnu.org/licenses/
 
 import os
 from abc import ABCMeta, abstractmethod
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, closing
 from enum import Enum
 from functools import singledispatch
 from pathlib import Path
 
-from psycopg2 import Error as PGError
+from psycopg2 import Error as PGError, connect
 from psycopg2.errors import RaiseException
 from psycopg2.extensions import cursor as BaseCursor, connection as BaseConnection
 from psycopg2.extras import NamedTupleCursor, execute_batch
@@ -32,20 +32,30 @@ from psycopg2.pool import AbstractConnectionPool, ThreadedConnectionPool
 from psycopg2.sql import SQL, Identifier
 
 from common import types as T
+from common.logging import log
 from common.models.filesystems.types import BaseFilesystem
 from ..types import BaseStateProtocol
 from ..exceptions import BackendException, LogicException, NoFilesystemConvertor
 
 
 # Get connection pool size constraints from environment, if available
-_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
-_POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+# NOTE If the maximum is not set explicitly, it is derived from the
+# server's connection limit, shared amongst the expected number of
+# replicas (i.e., concurrent clients)
+_POOL_MIN      = int(os.getenv("PG_POOL_MIN", "1"))
+_POOL_MAX      = os.getenv("PG_POOL_MAX")
+_POOL_SHARE    = float(os.getenv("PG_POOL_SHARE", "0.25"))
+_POOL_REPLICAS = int(os.getenv("PG_POOL_REPLICAS", "1"))
 
 
 class AdvisoryLockID(Enum):
     """ Enumeration of application-specific advisory lock IDs """
     DDL = 0
 
+class JobLockID(Enum):
+    """ Enumeration of application-specific, job-scoped advisory lock IDs """
+    Dispatch = 0
+
 class LockingMode(Enum):
     """ PostgreSQL locking mode enumeration """
     AccessShare          = "access share"
@@ -77,6 +87,31 @@ def _(exc:RaiseException) -> LogicException:
     # RaiseException -> LogicException
     return _exception("PL/pgSQL exception", exc, LogicException)
 
+def _pool_max(dsn:str) -> int:
+    """
+    Determine the maximum connection pool size, either from the
+    environment or from the server's connection limit
+
+    @param   dsn  Connection string
+    @return  Maximum connection pool size
+    """
+    if _POOL_MAX is not None:
+        return int(_POOL_MAX)
+
+    try:
+        with closing(connect(dsn)) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("show max_connections;")
+                (server_max,) = cursor.fetchone()
+
+    except PGError as exc:
+        raise _exception_mapper(exc)
+
+    pool_max = max(_POOL_MIN, 2, int(int(server_max) * _POOL_SHARE) // _POOL_REPLICAS)
+    log.debug(f"Connection pool sized to {pool_max} of {server_max} server connections")
+    return pool_max
+
+
 class _BaseSession(AbstractContextManager, metaclass=ABCMeta):
     """ Abstract base class for session context managers """
     _connection:BaseConnection
@@ -116,6 +151,15 @@ _QueryT = T.Union[SQL, str]
 _ParamT = T.Union[T.Tuple, T.Dict, None]
 _ExecT  = T.Tuple[_QueryT, _ParamT]
 
+class _PreparingConnection(BaseConnection):
+    """ Connection that tracks its server-side prepared statements """
+    prepared:T.Set[str]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
 class _LockableNamedTupleCursor(NamedTupleCursor):
     """ NamedTupleCursor with a locking context managers """
     def __init__(self, *args, **kwargs) -> None:
@@ -150,6 +194,20 @@ class _LockableNamedTupleCursor(NamedTupleCursor):
                 self._entry_query = ("select pg_advisory_lock(%s);", (lock_id.value,))
                 self._exit_query  = ("select pg_advisory_unlock(%s);", (lock_id.value,))
 
+        class _JobLock(_Lock):
+            """
+            Acquire a transaction-level advisory lock context manager
+            with the given advisory lock ID, scoped to the given job
+
+            @param  lock_id  Job-scoped advisory lock ID
+            @param  job_id   Job ID
+            """
+            # NOTE Transaction-level locks are released when the
+            # transaction ends, so there is no exit query
+            def __init__(self, lock_id:JobLockID, job_id:T.Identifier):
+                self._entry_query = ("select pg_advisory_xact_lock(%s, %s);", (lock_id.value, job_id))
+                self._exit_query  = None
+
         class _TableLock(_Lock):
             """
             Acquire a table lock context manager on the given tables
@@ -170,8 +228,38 @@ class _LockableNamedTupleCursor(NamedTupleCursor):
                 self._exit_query = None
 
         self.advisory_lock = _AdvisoryLock
+        self.job_lock = _JobLock
         self.table_lock = _TableLock
 
+    def fetchtuple(self) -> T.Optional[T.Tuple]:
+        """
+        Fetch the next row as a plain tuple, skipping named tuple
+        construction for when only positional access is needed
+
+        @return  Row tuple (None when no more rows are available)
+        """
+        return super(NamedTupleCursor, self).fetchone()
+
+    def execute_prepared(self, name:str, query:str, params:T.Tuple = ()) -> None:
+        """
+        Execute the given query as a named, server-side prepared
+        statement, which is prepared on first use by each connection
+
+        @param  name    Prepared statement name
+        @param  query   Query, with positional %s placeholders
+        @param  params  Query parameters
+        """
+        # NOTE Prepared statements outlive the transaction in which
+        # they're prepared (even if it's rolled back), so they persist
+        # for as long as the pooled connection
+        if name not in self.connection.prepared:
+            placeholders = tuple(f"${i}" for i in range(1, len(params) + 1))
+            self.execute(f"prepare {name} as {query % placeholders}")
+            self.connection.prepared.add(name)
+
+        arguments = f"({', '.join(['%s'] * len(params))})" if params else ""
+        self.execute(f"execute {name}{arguments};", params)
+
 
 class PostgreSQL(BaseStateProtocol):
     """
@@ -181,12 +269,16 @@ class PostgreSQL(BaseStateProtocol):
     methods for downstream, with dotted access to cursor results
     """
     _pool:AbstractConnectionPool
+    _dsn_key:str
 
     def __init__(self, *, database:str, user:str, password:str, host:str, port:int = 5432) -> None:
         self._filesystems = {}
+        self._dsn_key = f"{user}@{host}:{port}/{database}"
 
         dsn = f"dbname={database} user={user} password={password} host={host} port={port}"
-        self._pool = pool = ThreadedConnectionPool(_POOL_MIN, _POOL_MAX, dsn, cursor_factory=_LockableNamedTupleCursor)
+        self._pool = pool = ThreadedConnectionPool(_POOL_MIN, _pool_max(dsn), dsn,
+                                                   connection_factory=_PreparingConnection,
+                                                   cursor_factory=_LockableNamedTupleCursor)
 
         class _Transaction(_BaseSession):
             """
@@ -213,8 +305,10 @@ class PostgreSQL(BaseStateProtocol):
                     select pg_advisory_unlock(%(lock_id)s);
                 """, [{"lock_id": lock_id.value} for lock_id in AdvisoryLockID])
 
-                # Start transaction
-                self._cursor.execute("begin transaction;")
+                # Start transaction, unless each statement is to be
+                # committed as it's executed
+                if not self._autocommit:
+                    self._cursor.execute("begin transaction;")
 
             def teardown(self) -> None:
                 self._pool.putconn(self._connection)
@@ -224,15 +318,28 @@ class PostgreSQL(BaseStateProtocol):
     def __del__(self) -> None:
         self._pool.closeall()
 
+    @property
+    def dsn_key(self) -> str:
+        """ Return the database identity, without credentials """
+        return self._dsn_key
+
     def execute_script(self, sql:Path) -> None:
         """
         Execute the given SQL script against the database
 
         @param  sql  Path to SQL script
         """
+        self.execute_script_sql(sql.read_text())
+
+    def execute_script_sql(self, sql:str) -> None:
+        """
+        Execute the given SQL script source against the database
+
+        @param  sql  SQL script
+        """
         with self.transaction(autocommit=True) as t:
             with t.advisory_lock(AdvisoryLockID.DDL):
-                t.execute(sql.read_text())
+                t.execute(sql)
 
     def filesystem_convertor(self, name:str) -> BaseFilesystem:
         if name not in self._filesystems:
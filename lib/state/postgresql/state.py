@@ -23,10 +23,12 @@ from __future__ import annotations
 
 import importlib.resources as resource
 
+from psycopg2.extras import execute_values
+
 from common import types as T
 from common.models.filesystems.types import BaseFilesystem, Data
 from common.models.task import ExitCode, Task
-from .db import PostgreSQL, BaseCursor as Transaction
+from .db import PostgreSQL, JobLockID, BaseCursor as Transaction
 from ..types import BasePhaseStatus, BaseJobStatus, BaseAttempt, BaseJob, \
                     JobPhase, JobThroughput, DependentTask, DataOrigin, \
                     FORCIBLY_TERMINATED
@@ -38,59 +40,90 @@ from ..exceptions import *
 # even if they're correct in subsequent attempts.
 
 
+# Schema script, read once on import
+_SCHEMA = resource.read_text("lib.state.postgresql", "schema.sql")
+
+
 # Map our Python JobPhase enum to our PostgreSQL job_phase enum
 _PG_PHASE_ENUM = {
     JobPhase.Preparation: "prepare",
     JobPhase.Transfer:    "transfer"
 }
+_JOB_PHASE_ENUM = {pg_phase: phase for phase, pg_phase in _PG_PHASE_ENUM.items()}
 
 class PGPhaseStatus(BasePhaseStatus):
     _state:PostgreSQL
     _job_id:T.Identifier
     _phase:str
 
-    def __init__(self, state:PostgreSQL, job_id:T.Identifier, phase:JobPhase) -> None:
+    def __init__(self, state:PostgreSQL, job_id:T.Identifier, phase:JobPhase, *, start:T.Optional[T.DateTime] = None, finish:T.Optional[T.DateTime] = None) -> None:
         self._state  = state
         self._job_id = job_id
         self._phase  = _PG_PHASE_ENUM[phase]
 
-        # Initialise timestamps
-        self.start = self.finish = None
-
-        # Set timestamps from database, if available
-        with state.transaction() as t:
-            t.execute("""
-                select start,
+        self.start  = start
+        self.finish = finish
+
+    @classmethod
+    def fetch_all(cls, state:PostgreSQL, job_id:T.Identifier) -> T.Dict[JobPhase, PGPhaseStatus]:
+        """
+        Get the status of every phase of a job in a single query
+
+        @param   state   PostgreSQL state
+        @param   job_id  Job ID
+        @return  Dictionary of phase statuses
+        """
+        with state.transaction(autocommit=True) as t:
+            t.execute_prepared("phase_timestamps", """
+                select phase,
+                       start,
                        finish
                 from   job_timestamps
-                where  job   = %s
-                and    phase = %s;
-            """, (job_id, self._phase))
+                where  job = %s;
+            """, (job_id,))
 
-            # TODO Py3.8 walrus operator would be good here
-            timestamps = t.fetchone()
-            if timestamps is not None:
-                self.start  = timestamps.start
-                self.finish = timestamps.finish
+            timestamps = {_JOB_PHASE_ENUM[record.phase]: record for record in t.fetchall()}
+
+        # Phases that have yet to start have no timestamps
+        return {
+            phase: cls(state, job_id, phase,
+                       start  = timestamps[phase].start  if phase in timestamps else None,
+                       finish = timestamps[phase].finish if phase in timestamps else None)
+            for phase in JobPhase
+        }
 
     def init(self) -> T.DateTime:
         # Set the start time, if it hasn't been already, and return it
         if self.start is None:
             with self._state.transaction() as t:
-                # NOTE In the below, the returning clause will only
-                # return if a change was made, thus we forcibly make a
-                # redundant change (rather than "do nothing") on
-                # conflicts. Such a conflict could occur because
-                # multiple workers may try to initialise the phase.
-                t.execute("""
-                    insert into job_timestamps (job, phase)
-                                        values (%s, %s)
-                                   on conflict (job, phase)
-                                 do update set job = excluded.job
-                                     returning start;
-                """, (self._job_id, self._phase))
+                # NOTE Multiple workers may try to initialise the phase,
+                # so on conflict we do nothing (rather than rewrite the
+                # row) and fall back to the existing start time
+                t.execute_prepared("phase_init", """
+                    with inserted as (
+                        insert into job_timestamps (job, phase)
+                                            values (%s, %s)
+                                       on conflict (job, phase)
+                                        do nothing
+                                         returning start
+                    )
+                    select start from inserted
+                    union all
+                    select start from job_timestamps where job = %s and phase = %s;
+                """, (self._job_id, self._phase, self._job_id, self._phase))
+
+                # TODO Py3.8 walrus operator would be good here
+                timestamp = t.fetchtuple()
+                if timestamp is None:
+                    # The conflicting record was committed after the
+                    # above statement's snapshot, so we must look again
+                    t.execute_prepared("phase_start", """
+                        select start from job_timestamps where job = %s and phase = %s;
+                    """, (self._job_id, self._phase))
+
+                    timestamp = t.fetchtuple()
 
-                self.start = t.fetchone().start
+                (self.start,) = timestamp
 
         return self.start
 
@@ -102,7 +135,7 @@ class PGPhaseStatus(BasePhaseStatus):
         with self._state.transaction() as t:
             # NOTE The start time must have been recorded, at this
             # point, so an update will always be possible
-            t.execute("""
+            t.execute_prepared("phase_stop", """
                 update    job_timestamps
                 set       finish = coalesce(finish, now())
                 where     job    = %s
@@ -110,7 +143,7 @@ class PGPhaseStatus(BasePhaseStatus):
                 returning finish;
             """, (self._job_id, self._phase))
 
-            self.finish = t.fetchone().finish
+            (self.finish,) = t.fetchtuple()
 
         return self.finish
 
@@ -118,38 +151,66 @@ class PGPhaseStatus(BasePhaseStatus):
 class PGJobStatus(BaseJobStatus):
     _state:PostgreSQL
     _job_id:T.Identifier
+    _phases:T.Optional[T.Dict[JobPhase, PGPhaseStatus]]
+    _counts:T.Optional[T.Dict[str, int]]
 
     def __init__(self, state:PostgreSQL, job_id:T.Identifier) -> None:
         self._state  = state
         self._job_id = job_id
+        self._phases = None
+        self._counts = None
+
+    def _task_count(self, task_state:str) -> int:
+        # All task counts are fetched together, on first request
+        if self._counts is None:
+            with self._state.transaction(autocommit=True) as t:
+                # NOTE Without grouping, this aggregate always returns
+                # exactly one row, even for jobs without any tasks
+                t.execute("""
+                    select coalesce(sum(pending), 0)   as pending,
+                           coalesce(sum(running), 0)   as running,
+                           coalesce(sum(failed), 0)    as failed,
+                           coalesce(sum(succeeded), 0) as succeeded
+                    from   job_status
+                    where  job = %s;
+                """, (self._job_id,))
 
-        with state.transaction() as t:
-            t.execute("""
-                select   sum(pending)   as pending,
-                         sum(running)   as running,
-                         sum(failed)    as failed,
-                         sum(succeeded) as succeeded
-                from     job_status
-                where    job = %s
-                group by job;
-            """, (job_id,))
+                self._counts = t.fetchone()._asdict()
 
-            status = t.fetchone()
-            self.pending   = status.pending   if status else 0
-            self.running   = status.running   if status else 0
-            self.failed    = status.failed    if status else 0
-            self.succeeded = status.succeeded if status else 0
+        return self._counts[task_state]
+
+    @property
+    def pending(self) -> int:
+        return self._task_count("pending")
+
+    @property
+    def running(self) -> int:
+        return self._task_count("running")
+
+    @property
+    def failed(self) -> int:
+        return self._task_count("failed")
+
+    @property
+    def succeeded(self) -> int:
+        return self._task_count("succeeded")
 
     def throughput(self, source:BaseFilesystem, target:BaseFilesystem) -> JobThroughput:
-        with self._state.transaction() as t:
+        with self._state.transaction(autocommit=True) as t:
+            # NOTE Filesystem names are only unique per job, so we also
+            # join on the job to resolve them by that index. This query
+            # is deliberately not prepared, so it's always planned with
+            # its actual parameters rather than a generic plan.
             t.execute("""
                 select job_throughput.transfer_rate,
                        job_throughput.failure_rate
                 from   job_throughput
                 join   filesystems as source_fs
-                on     source_fs.id = job_throughput.source
+                on     source_fs.id  = job_throughput.source
+                and    source_fs.job = job_throughput.job
                 join   filesystems as target_fs
-                on     target_fs.id = job_throughput.target
+                on     target_fs.id  = job_throughput.target
+                and    target_fs.job = job_throughput.job
                 where  job_throughput.job = %s
                 and    source_fs.name     = %s
                 and    target_fs.name     = %s;
@@ -163,7 +224,11 @@ class PGJobStatus(BaseJobStatus):
         return JobThroughput(rates.transfer_rate, rates.failure_rate)
 
     def phase(self, phase:JobPhase) -> PGPhaseStatus:
-        return PGPhaseStatus(self._state, self._job_id, phase)
+        # All phases are fetched together, on first request
+        if self._phases is None:
+            self._phases = PGPhaseStatus.fetch_all(self._state, self._job_id)
+
+        return self._phases[phase]
 
 
 class PGAttempt(BaseAttempt):
@@ -178,7 +243,7 @@ class PGAttempt(BaseAttempt):
 
         # Reconstruct task from persisted data
         with state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_task", """
                 select tasks.script,
                        source.id      as source_id,
                        source_fs.name as source_fs,
@@ -227,28 +292,28 @@ class PGAttempt(BaseAttempt):
     def init(self) -> T.DateTime:
         # FIXME init and stop are very similar
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_init", """
                 update    attempts
                 set       start = coalesce(start, now())
                 where     id = %s
                 returning start;
             """, (self._attempt_id,))
 
-            self.start = t.fetchone().start
+            (self.start,) = t.fetchtuple()
 
         return self.start
 
     def stop(self) -> T.DateTime:
         # FIXME init and stop are very similar
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_stop", """
                 update    attempts
                 set       finish = coalesce(finish, now())
                 where     id = %s
                 returning finish;
             """, (self._attempt_id,))
 
-            self.finish = t.fetchone().finish
+            (self.finish,) = t.fetchtuple()
 
         return self.finish
 
@@ -260,24 +325,30 @@ class PGAttempt(BaseAttempt):
         data_id, data = self._origin_id[origin]
 
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_size", """
                 select size
                 from   size
                 where  data = %s;
             """, (data_id,))
 
+            # NOTE If a concurrent attempt stored the size between our
+            # check and insert, we forcibly make a redundant change on
+            # conflict, so the returning clause yields the stored value
             # TODO Py3.8 walrus operator would be good here
-            record = t.fetchone()
+            record = t.fetchtuple()
             if record is None:
-                t.execute("""
+                t.execute_prepared("attempt_store_size", """
                     insert into size (data, size)
                               values (%s, %s)
+                         on conflict (data)
+                       do update set size = size.size
                            returning size;
                 """, (data_id, data.filesystem.size(data.address)))
 
-                record = t.fetchone()
+                record = t.fetchtuple()
 
-        return record.size
+        (size,) = record
+        return size
 
     def checksum(self, origin:DataOrigin, algorithm:str) -> str:
         # FIXME [CRITICAL] If the checksums don't match during an
@@ -288,37 +359,42 @@ class PGAttempt(BaseAttempt):
         data_id, data = self._origin_id[origin]
 
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_checksum", """
                 select checksum
                 from   checksums
                 where  data      = %s
                 and    algorithm = %s;
             """, (data_id, algorithm))
 
+            # NOTE As with sizes, conflicting inserts yield the checksum
+            # that was stored first
             # TODO Py3.8 walrus operator would be good here
-            record = t.fetchone()
+            record = t.fetchtuple()
             if record is None:
-                t.execute("""
+                t.execute_prepared("attempt_store_checksum", """
                     insert into checksums (data, algorithm, checksum)
                                    values (%s, %s, %s)
+                              on conflict (data, algorithm)
+                            do update set checksum = checksums.checksum
                                 returning checksum;
                 """, (data_id, algorithm, data.filesystem.checksum(algorithm, data.address)))
 
-                record = t.fetchone()
+                record = t.fetchtuple()
 
-        return record.checksum
+        (checksum,) = record
+        return checksum
 
     @property
     def exit_code(self) -> ExitCode:
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_exit_code", """
                 select exit_code
                 from   attempts
                 where  id = %s;
             """, (self._attempt_id,))
 
             # TODO Py3.8 walrus operator would be good here
-            exit_code = t.fetchone().exit_code
+            (exit_code,) = t.fetchtuple()
             if exit_code is None:
                 raise DataNotReady("Attempt is still in progress")
 
@@ -327,7 +403,7 @@ class PGAttempt(BaseAttempt):
     @exit_code.setter
     def exit_code(self, value:ExitCode) -> None:
         with self._state.transaction() as t:
-            t.execute("""
+            t.execute_prepared("attempt_set_exit_code", """
                 update attempts
                 set    exit_code = %s
                 where  id        = %s;
@@ -335,132 +411,175 @@ class PGAttempt(BaseAttempt):
 
 
 class PGJob(BaseJob):
+    _schema_ready:T.ClassVar[T.Set[str]] = set()
     _state:PostgreSQL
+    _max_attempts:T.Optional[int]
+    _metadata:T.Optional[T.Dict[str, str]]
 
     def __init__(self, state:PostgreSQL, *, client_id:str, job_id:T.Optional[T.Identifier] = None, force_restart:bool = False) -> None:
         self._state = state
         self._client_id = client_id
 
-        # Create schema (idempotent)
-        try:
-            with resource.path("lib.state.postgresql", "schema.sql") as schema:
-                state.execute_script(schema)
+        # Job parameters are cached on first read and refreshed by their
+        # respective setters
+        self._max_attempts = None
+        self._metadata = None
 
-        except LogicException as e:
-            message = f"Could not create schema\n{e}"
-            raise LogicException(message)
-
-        # Check previous job exists under the same client
-        if job_id is not None:
-            with state.transaction() as t:
-                t.execute("""
-                    select * from jobs where id = %s and client = %s;
-                """, (job_id, client_id))
+        # Create schema (idempotent), once per database
+        if state.dsn_key not in PGJob._schema_ready:
+            try:
+                state.execute_script_sql(_SCHEMA)
 
-                if t.fetchone() is None:
-                    raise BackendException(f"Job {job_id} does not exist or was started with a different client")
+            except LogicException as e:
+                message = f"Could not create schema\n{e}"
+                raise LogicException(message)
 
-        # Reset previously running task status on resumption
-        if job_id is not None and force_restart:
-            if any(self.status.phase(phase) for phase in JobPhase):
-                raise DataNotReady(f"Cannot restart job {job_id}; still in progress")
+            PGJob._schema_ready.add(state.dsn_key)
 
-            with state.transaction() as t:
-                t.execute("""
-                    with previously_running as (
-                        select id
-                        from   task_status
-                        where  succeeded is null
-                    )
-                    update attempts
-                    set    start     = coalesce(start, now()),
-                           finish    = now(),
-                           exit_code = %s
-                    where  id in (select id from previously_running);
-                """, (FORCIBLY_TERMINATED.exit_code,))
-
-        # Create new job
-        if job_id is None:
-            with state.transaction() as t:
+        # Create or resume the job in a single transaction
+        with state.transaction() as t:
+            if job_id is None:
+                # Create new job
                 t.execute("""
                     insert into jobs (client, max_attempts)
                               values (%s, 1)
                            returning id;
                 """, (client_id,))
 
-                job_id = t.fetchone().id
+                (job_id,) = t.fetchtuple()
+
+            else:
+                # Check previous job exists under the same client
+                t.execute("""
+                    select id from jobs where id = %s and client = %s;
+                """, (job_id, client_id))
+
+                if t.fetchtuple() is None:
+                    raise BackendException(f"Job {job_id} does not exist or was started with a different client")
+
+                # Reset previously running task status on resumption
+                if force_restart:
+                    if PGJob._in_progress(t, job_id):
+                        raise DataNotReady(f"Cannot restart job {job_id}; still in progress")
+
+                    # NOTE Concurrent resumptions skip, rather than wait
+                    # on, attempts that are already being reset
+                    t.execute("""
+                        update attempts
+                        set    start     = coalesce(attempts.start, now()),
+                               finish    = now(),
+                               exit_code = %s
+                        from   (
+                                   select   attempts.id
+                                   from     attempts
+                                   join     tasks
+                                   on       tasks.id = attempts.task
+                                   where    tasks.job = %s
+                                   and      attempts.exit_code is null
+                                   for update of attempts skip locked
+                               ) as previously_running
+                        where  attempts.id = previously_running.id;
+                    """, (FORCIBLY_TERMINATED.exit_code, job_id))
 
         self._job_id = job_id
 
-    def _add_data(self, t:Transaction, data:Data, persist_size:bool = False) -> T.Identifier:
-        # Add data record (filesystem and address) to database
+    def _add_data(self, t:Transaction, data:T.List[Data]) -> T.List[T.Identifier]:
+        # Add data records (filesystem and address) to database, in bulk,
+        # returning their identifiers in the order they were given
 
         # NOTE In the below, the returning clause will only return if a
         # change was made, thus we forcibly make a redundant change
         # (rather than "do nothing") on conflicts
-        t.execute("""
-            insert into filesystems (job, name, max_concurrency)
-                             values (%s, %s, %s)
-                        on conflict (job, name)
-                      do update set name = excluded.name
-                          returning id;
-        """, (self._job_id, data.filesystem.name, data.filesystem.max_concurrency))
-
-        filesystem_id = t.fetchone().id
-
-        t.execute("""
-            insert into data (filesystem, address)
-                      values (%s, %s)
-                   returning id;
-        """, (filesystem_id, str(data.address)))
-
-        data_id = t.fetchone().id
-
-        if persist_size:
-            # The root source data size should be persisted
-            filesize = data.filesystem.size(data.address)
-            t.execute("insert into size (data, size) values (%s, %s);", (data_id, filesize))
-
-        return data_id
+        filesystems = {datum.filesystem.name: datum.filesystem for datum in data}
+        t.execute_prepared("add_data", """
+            with new_data as (
+                select *
+                from   unnest(%s::text[], %s::text[]) with ordinality as new_data(filesystem, address, position)
+            ),
+            job_filesystems as (
+                insert into filesystems (job, name, max_concurrency)
+                     select %s::integer, name, max_concurrency
+                     from   unnest(%s::text[], %s::integer[]) as new_filesystems(name, max_concurrency)
+                on conflict (job, name)
+              do update set name = excluded.name
+                  returning id, name
+            ),
+            inserted as (
+                insert into data (filesystem, address)
+                     select job_filesystems.id, new_data.address
+                     from   new_data
+                     join   job_filesystems
+                     on     job_filesystems.name = new_data.filesystem
+                  returning id, filesystem, address
+            )
+            select   inserted.id
+            from     new_data
+            join     job_filesystems
+            on       job_filesystems.name = new_data.filesystem
+            join     inserted
+            on       inserted.filesystem  = job_filesystems.id
+            and      inserted.address     = new_data.address
+            order by new_data.position;
+        """, ([datum.filesystem.name for datum in data],
+              [str(datum.address) for datum in data],
+              self._job_id,
+              [fs.name for fs in filesystems.values()],
+              [fs.max_concurrency for fs in filesystems.values()]))
+
+        return [record.id for record in t.fetchall()]
 
     @staticmethod
-    def _get_target_id(t:Transaction, task_id:T.Identifier) -> T.Identifier:
-        # Get the target data identifier for a task
-        t.execute("select target from tasks where id = %s;", (task_id,))
-        return t.fetchone().target
-
-    def _add_task_tree(self, task:T.Optional[DependentTask]) -> T.Optional[T.Identifier]:
-        if task is None:
-            return None
-
-        # Recursively add dependencies until we bottom out (i.e., above)
-        dependency = self._add_task_tree(task.dependency)
-        root_task = dependency is None
+    def _in_progress(t:Transaction, job_id:T.Identifier) -> bool:
+        # Check whether any phase of a job has yet to finish, including
+        # phases that have yet to start
+        t.execute("""
+            select exists (
+                select    1
+                from      unnest(enum_range(null::job_phase)) as phases(phase)
+                left join job_timestamps
+                on        job_timestamps.job   = %s
+                and       job_timestamps.phase = phases.phase
+                where     job_timestamps.finish is null
+            ) as in_progress;
+        """, (job_id,))
+
+        (in_progress,) = t.fetchtuple()
+        return in_progress
+
+    def _add_task_tree(self, task:DependentTask) -> T.Identifier:
+        # Flatten the chain of dependencies, from its root
+        chain:T.List[Task] = []
+        dependent:T.Optional[DependentTask] = task
+        while dependent is not None:
+            chain.append(dependent.task)
+            dependent = dependent.dependency
+
+        chain.reverse()
+        root = chain[0].source
 
-        # Add task
         with self._state.transaction() as t:
-            task_values = {
-                "job_id":        self.job_id,
+            # The source of a task is the same as the target of its
+            # dependency, if it has one, so only the root source and the
+            # targets are added as data records; otherwise we'd trip over
+            # the uniqueness constraint set by the schema
+            data_ids = self._add_data(t, [root, *(step.target for step in chain)])
 
-                # The source of a task is the same as the target of its
-                # dependency, if it has one, so only add data records to
-                # the database when we need to; otherwise we'd trip over
-                # the uniqueness constraint set by the schema
-                "source_id":     self._add_data(t, task.task.source, True) if root_task else \
-                                 PGJob._get_target_id(t, dependency),
-                "target_id":     self._add_data(t, task.task.target),
+            # The root source data size should be persisted
+            t.execute_prepared("add_size", "insert into size (data, size) values (%s, %s);",
+                               (data_ids[0], root.filesystem.size(root.address)))
 
-                "script":        task.task.script,
-                "dependency_id": dependency
-            }
+            # Add tasks in dependency order
+            task_id = None
+            for step, source_id, target_id in zip(chain, data_ids, data_ids[1:]):
+                t.execute_prepared("add_task", """
+                    insert into tasks (job, source, target, script, dependency)
+                               values (%s, %s, %s, %s, %s)
+                            returning id;
+                """, (self.job_id, source_id, target_id, step.script, task_id))
 
-            t.execute("""
-                insert into tasks (job, source, target, script, dependency)
-                           values (%(job_id)s, %(source_id)s, %(target_id)s, %(script)s, %(dependency_id)s)
-                        returning id;
-            """, task_values)
+                (task_id,) = t.fetchtuple()
 
-            return t.fetchone().id
+        return task_id
 
     def __iadd__(self, task:DependentTask) -> PGJob:
         _ = self._add_task_tree(task)
@@ -468,82 +587,101 @@ class PGJob(BaseJob):
 
     def attempt(self, time_limit:T.Optional[T.TimeDelta] = None) -> PGAttempt:
         with self._state.transaction() as t:
-            with t.table_lock("attempts"):
+            # NOTE todo is an aggregate view, so its rows can't be
+            # locked; instead, we serialise dispatch per job, so its
+            # filesystems' concurrency limits are respected, without
+            # blocking anything else that touches attempts
+            with t.job_lock(JobLockID.Dispatch, self.job_id):
+                # Create sentinel attempt record for a task to do
                 if time_limit is None:
+                    statement = "dispatch"
                     query = """
-                        select task
-                        from   todo
-                        where  job = %s
-                        limit  1;
+                        insert into attempts (task)
+                             select task
+                             from   todo
+                             where  job = %s
+                             limit  1
+                          returning id;
                     """
                     params = (self.job_id,)
 
                 else:
+                    statement = "dispatch_eta"
                     query = """
-                        select  task
-                        from    todo
-                        where   job = %s
-                        and    (eta is null
-                        or      eta <= %s)
-                        limit   1;
+                        insert into attempts (task)
+                             select  task
+                             from    todo
+                             where   job = %s
+                             and    (eta is null
+                             or      eta <= %s)
+                             limit   1
+                          returning id;
                     """
                     params = (self.job_id, time_limit)
 
-                t.execute(query, params)
+                t.execute_prepared(statement, query, params)
 
                 # TODO Py3.8 walrus operator would be good here
-                todo = t.fetchone()
-                if todo is None:
+                attempt = t.fetchtuple()
+                if attempt is None:
                     raise NoTasksAvailable("No tasks are currently available to attempt")
 
-                # Create sentinel attempt record
-                t.execute("""
-                    insert into attempts (task)
-                                  values (%s)
-                               returning id;
-                """, (todo.task,))
-
-                attempt_id = t.fetchone().id
+                (attempt_id,) = attempt
 
         return PGAttempt(self._state, attempt_id)
 
     @property
     def max_attempts(self) -> int:
-        with self._state.transaction() as t:
-            t.execute("""
-                select max_attempts from jobs where id = %s;
-            """, (self.job_id,))
+        if self._max_attempts is None:
+            with self._state.transaction(autocommit=True) as t:
+                t.execute_prepared("job_max_attempts", """
+                    select max_attempts from jobs where id = %s;
+                """, (self.job_id,))
+
+                (self._max_attempts,) = t.fetchtuple()
 
-            return t.fetchone().max_attempts
+        return self._max_attempts
 
     @max_attempts.setter
     def max_attempts(self, value:int) -> None:
         with self._state.transaction() as t:
-            t.execute("""
-                update jobs
-                set    max_attempts = %s
-                where  id           = %s;
+            t.execute_prepared("job_set_max_attempts", """
+                update    jobs
+                set       max_attempts = %s
+                where     id           = %s
+                returning id;
             """, (value, self.job_id))
 
+            if t.fetchtuple() is None:
+                raise BackendException(f"Could not set maximum attempts; job {self.job_id} does not exist")
+
+        self._max_attempts = value
+
     @property
     def status(self) -> PGJobStatus:
         return PGJobStatus(self._state, self.job_id)
 
     @property
     def metadata(self) -> T.SimpleNamespace:
-        with self._state.transaction() as t:
-            t.execute("""
-                select key, value from job_metadata where job = %s;
-            """, (self.job_id,))
+        if self._metadata is None:
+            with self._state.transaction(autocommit=True) as t:
+                t.execute_prepared("job_metadata", """
+                    select key, value from job_metadata where job = %s;
+                """, (self.job_id,))
 
-            return T.SimpleNamespace(**{k:v for k, v in t.fetchall() or {}})
+                self._metadata = dict(t.fetchall())
+
+        return T.SimpleNamespace(**self._metadata)
 
     def set_metadata(self, **metadata:str) -> None:
+        # Upsert all the key/value pairs in a single statement
         with self._state.transaction() as t:
-            for k, v in metadata.items():
-                t.execute("""
-                    insert into job_metadata (job, key, value)
-                                      values (%s, %s, %s)
-                                 on conflict (job, key)
-                               do update set value = excluded.value;
-                """, (self.job_id, k, v))
+            execute_values(t, """
+                insert into job_metadata (job, key, value)
+                                  values %s
+                             on conflict (job, key)
+                           do update set value = excluded.value;
+            """, [(self.job_id, k, v) for k, v in metadata.items()])
+
+        if self._metadata is not None:
+            self._metadata.update(metadata)
@@ -255,12 +255,6 @@ class BaseAttempt(_AttemptMixin, _BaseDurationMixin, metaclass=ABCMeta):
     def exit_code(self, value:ExitCode) -> None:
         """ Persist the task's exit code for this attempt """
 
-    def _get_source_properties(self, *algorithms:str) -> T.Tuple[int, T.Dict[str, str]]:
-        # Fetch the source data's size and checksums using the specified
-        # algorithms (to be run internally in a separate thread)
-        return self.size(_SOURCE), \
-               {algorithm: self.checksum(_SOURCE, algorithm) for algorithm in algorithms}
-
     def __call__(self) -> bool:
         """ Attempt the transfer task """
         # The context manager sets the attempt start and finish timestamps
@@ -271,47 +265,51 @@ class BaseAttempt(_AttemptMixin, _BaseDurationMixin, metaclass=ABCMeta):
                      f"{task.target.address} on {task.target.filesystem}")
 
             with ThreadPoolExecutor(max_workers=1) as executor:
+                # Fetch the source data's size, then its checksum, in a
+                # separate thread; the size will be available first
                 # TODO Different/multiple checksum algorithms
-                properties = executor.submit(self._get_source_properties, "md5")
+                source_size = executor.submit(self.size, _SOURCE)
+                source_checksum = executor.submit(self.checksum, _SOURCE, "md5")
 
-                # Run task in main tread and join on properties thread
+                # Run task in main tread
                 success = self.task()
-                source_size, source_checksums = properties.result()
-
-            if not success:
-                log.warning(f"Attempt failed with exit code {success.exit_code}")
-
-            else:
-                log.info(f"Data copied; verifying...")
-
-                try:
-                    target_size = self.size(_TARGET)
-                    if source_size != target_size:
-                        log.warning(f"Attempt failed: "
-                                    f"Source is {source_size} bytes; "
-                                    f"target is {target_size} bytes")
-
-                        success = _MISMATCHED_SIZE
-                        raise _VerificationFailure()
-
-                    # TODO Different/multiple checksum algorithms
-                    source_checksum = source_checksums["md5"]
-                    target_checksum = self.checksum(_TARGET, "md5")
-                    if source_checksum != target_checksum:
-                        log.warning(f"Attempt failed: "
-                                    f"Source has checksum {source_checksum}; "
-                                    f"target has checksum {target_checksum}")
-
-                        success = _MISMATCHED_CHECKSUM
-                        raise _VerificationFailure()
-
-                    # TODO Data metadata: There is no need to set this
-                    # for each intermediary stage; just set the final
-                    # target metadata to that of the original source.
-                    # Think about how to implement this...
-
-                except _VerificationFailure:
-                    pass
+
+                if not success:
+                    log.warning(f"Attempt failed with exit code {success.exit_code}")
+
+                else:
+                    log.info(f"Data copied; verifying...")
+
+                    try:
+                        target_size = self.size(_TARGET)
+                        if source_size.result() != target_size:
+                            log.warning(f"Attempt failed: "
+                                        f"Source is {source_size.result()} bytes; "
+                                        f"target is {target_size} bytes")
+
+                            success = _MISMATCHED_SIZE
+                            raise _VerificationFailure()
+
+                        # NOTE The target is checksummed in the main
+                        # thread, concurrently with the source, if the
+                        # latter is still in progress
+                        # TODO Different/multiple checksum algorithms
+                        target_checksum = self.checksum(_TARGET, "md5")
+                        if source_checksum.result() != target_checksum:
+                            log.warning(f"Attempt failed: "
+                                        f"Source has checksum {source_checksum.result()}; "
+                                        f"target has checksum {target_checksum}")
+
+                            success = _MISMATCHED_CHECKSUM
+                            raise _VerificationFailure()
+
+                        # TODO Data metadata: There is no need to set this
+                        # for each intermediary stage; just set the final
+                        # target metadata to that of the original source.
+                        # Think about how to implement this...
+
+                    except _VerificationFailure:
+                        pass
 
             self.exit_code = success
             return bool(success)